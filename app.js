@@ -1,7 +1,20 @@
+// The exporter's manifest.json names each CSV (*.csv.gz with EXPORT_CSV_GZIP=1);
+// without one, assume plain *.csv
+async function loadManifest(base){
+  try {
+    const res = await fetch(base + 'manifest.json');
+    if (res.ok) return await res.json();
+  } catch (err) { /* fall through */ }
+  return {};
+}
+
 async function loadCSV(path){
   const res = await fetch(path);
   if(!res.ok) throw new Error(`Failed to load ${path}`);
-  const txt = await res.text();
+  // Pages serves *.gz as opaque application/gzip, so inflate it here
+  const txt = path.endsWith('.gz')
+    ? await new Response(res.body.pipeThrough(new DecompressionStream('gzip'))).text()
+    : await res.text();
   const [header, ...lines] = txt.trim().split(/\r?\n/);
   const cols = header.split(',');
   return lines.map(line => {
@@ -34,11 +47,13 @@ async function loadAll() {
   const base = './exports/';
 
   try {
+    const manifest = await loadManifest(base);
+    const csv = stem => base + (manifest[stem] || stem + '.csv');
     const [matrix, latest, gaps, treemap] = await Promise.all([
-      loadCSV(base + 'critical_mass_matrix.csv'),
-      loadCSV(base + 'unit_concept_latest.csv'),
-      loadCSV(base + 'gaps_opportunities.csv'),
-      loadCSV(base + 'portfolio_treemap.csv'),
+      loadCSV(csv('critical_mass_matrix')),
+      loadCSV(csv('unit_concept_latest')),
+      loadCSV(csv('gaps_opportunities')),
+      loadCSV(csv('portfolio_treemap')),
     ]);
 
     state.matrix = matrix;
@@ -1,30 +1,146 @@
+import argparse
+import json
 import os
+from concurrent.futures import ThreadPoolExecutor
 import duckdb
-import pandas as pd
 
 OUT_DIR = os.environ.get('DASHBOARD_OUT_DIR', 'site/exports')
-os.makedirs(OUT_DIR, exist_ok=True)
-con = duckdb.connect('data/warehouse.duckdb')
+# The dashboard (app.js) reads the CSVs, so they stay on unless EXPORT_CSV=0
+EXPORT_CSV = os.environ.get('EXPORT_CSV', '1') != '0'
+# EXPORT_CSV_GZIP=1 writes *.csv.gz instead (app.js finds it via MANIFEST)
+EXPORT_CSV_GZIP = os.environ.get('EXPORT_CSV_GZIP', '0') == '1'
+# DuckDB worker threads shared by the concurrent exports
+THREADS = int(os.environ.get('DUCKDB_THREADS', os.cpu_count() or 4))
+MAX_WORKERS = 4
+# Names the CSV file written for each export stem, for app.js
+MANIFEST = 'manifest.json'
+# Only the small seed tables have blocks to warm, so the community extension
+# install is skipped unless EXPORT_PREWARM=1
+EXPORT_PREWARM = os.environ.get('EXPORT_PREWARM', '0') == '1'
 
-def export(view_name: str, filename: str) -> None:
-    df = con.execute(f"select * from {view_name}").fetch_df()
-    df.to_csv(os.path.join(OUT_DIR, filename), index=False)
-    print(f"Exported {filename} ({len(df)} rows)")
+# view -> output file stem (dbt views plus the treemap source built below)
+EXPORTS = {
+    'dashboard_unit_concept_latest':  'unit_concept_latest',
+    'dashboard_gaps_portfolio':       'gaps_opportunities',
+    'dashboard_critical_mass_matrix': 'critical_mass_matrix',
+    'tmp_portfolio':                  'portfolio_treemap',
+}
 
-# Export dbt views
-export('dashboard_unit_concept_latest',   'unit_concept_latest.csv')
-export('dashboard_gaps_portfolio',        'gaps_opportunities.csv')
-export('dashboard_critical_mass_matrix',  'critical_mass_matrix.csv')
+# dashboard_unit_concept_latest feeds both its own export and the treemap
+# source, so it is evaluated once into this scratch table. It has to be a
+# regular table rather than a TEMP one: temp tables are private to a
+# connection and the exports run on separate cursors.
+UCL_TABLE = '_ucl'
+UCL_VIEWS = {'dashboard_unit_concept_latest', 'tmp_portfolio'}
 
-# Build a simple treemap source without taxonomy join
-con.execute("""
+# Relation names get interpolated into SQL (identifiers can't be bound as
+# parameters), so only these are ever accepted.
+ALLOWED_VIEWS = frozenset(EXPORTS) | {UCL_TABLE}
+
+# Simple treemap source without taxonomy join
+PORTFOLIO_SQL = """
 create or replace view tmp_portfolio as
 select
   concept_label as node,
   1 as level,
   unit_id,
   sum(works_latest) as size
-from dashboard_unit_concept_latest
+from _ucl
 group by 1,2,3
-""")
-export('tmp_portfolio', 'portfolio_treemap.csv')
+"""
+
+def prewarm(con) -> None:
+    """Load base-table blocks into the buffer pool up front; no-op without cache_prewarm."""
+    # Only tables have blocks to load: the dbt models are views over the seeds
+    # and the ETL CSVs, so this warms the seed tables.
+    try:
+        con.execute("install cache_prewarm from community")
+        con.execute("load cache_prewarm")
+        tables = con.execute(
+            "select table_name from duckdb_tables() where not temporary"
+        ).fetchall()
+        for (table,) in tables:
+            con.execute("select prewarm(?)", [table])
+    except duckdb.Error as e:
+        print(f"[warn] cache_prewarm unavailable, skipping: {str(e).splitlines()[0]}")
+
+def export_parquet(con, view_name: str, path: str) -> int:
+    (n,) = con.execute(
+        f"copy (select * from {view_name}) to '{path}' (format parquet, compression zstd)"
+    ).fetchone()
+    return n
+
+def export_csv(con, view_name: str, path: str, gzip: bool = False) -> int:
+    options = "header, format csv, compression gzip" if gzip else "header, format csv"
+    (n,) = con.execute(
+        f"copy (select * from {view_name}) to '{path}' ({options})"
+    ).fetchone()
+    return n
+
+def export(con, source: str, name: str) -> list:
+    """Write one view or table; returns (filename, rows) pairs for logging."""
+    if source not in ALLOWED_VIEWS:
+        raise ValueError(f"refusing to export unknown view {source!r}")
+    # COPY writes the files inside DuckDB and returns the number of rows written
+    written = []
+    n = export_parquet(con, source, os.path.join(OUT_DIR, f"{name}.parquet"))
+    written.append((f"{name}.parquet", n))
+    if EXPORT_CSV:
+        filename = f"{name}.csv.gz" if EXPORT_CSV_GZIP else f"{name}.csv"
+        n = export_csv(con, source, os.path.join(OUT_DIR, filename), gzip=EXPORT_CSV_GZIP)
+        written.append((filename, n))
+    return written
+
+def write_manifest(files: dict) -> None:
+    with open(os.path.join(OUT_DIR, MANIFEST), 'w', encoding='utf-8') as fh:
+        json.dump(files, fh, indent=2, sort_keys=True)
+
+def parse_args() -> argparse.Namespace:
+    p = argparse.ArgumentParser(description="Export dbt dashboard views for the static site.")
+    p.add_argument('--views', default=','.join(EXPORTS),
+                   help="comma-separated views to export (default: all)")
+    return p.parse_args()
+
+def main() -> None:
+    args = parse_args()
+    views = [v.strip() for v in args.views.split(',') if v.strip()]
+    unknown = sorted(set(views) - set(EXPORTS))
+    if unknown:
+        raise SystemExit(f"Unknown view(s): {', '.join(unknown)}. Choose from: {', '.join(EXPORTS)}")
+
+    os.makedirs(OUT_DIR, exist_ok=True)
+    con = duckdb.connect('data/warehouse.duckdb')
+    con.execute(f"pragma threads={THREADS}")
+    if EXPORT_PREWARM:
+        prewarm(con)
+
+    sources = {view: view for view in views}
+    try:
+        if UCL_VIEWS & set(views):
+            con.execute(f"create or replace table {UCL_TABLE} as select * from dashboard_unit_concept_latest")
+            if 'dashboard_unit_concept_latest' in sources:
+                sources['dashboard_unit_concept_latest'] = UCL_TABLE
+        if 'tmp_portfolio' in views:
+            con.execute(PORTFOLIO_SQL)
+
+        # One cursor per export: cursors are child connections of the same
+        # database, so the COPYs overlap while sharing one buffer pool.
+        with ThreadPoolExecutor(max_workers=min(MAX_WORKERS, len(views) or 1)) as pool:
+            futures = [
+                pool.submit(export, con.cursor(), sources[view], EXPORTS[view])
+                for view in views
+            ]
+            csv_files = {}
+            for view, f in zip(views, futures):
+                for filename, n in f.result():
+                    print(f"Exported {filename} ({n} rows)")
+                    if not filename.endswith('.parquet'):
+                        csv_files[EXPORTS[view]] = filename
+        write_manifest(csv_files)
+    finally:
+        # tmp_portfolio reads from the scratch table, so both go together
+        con.execute("drop view if exists tmp_portfolio")
+        con.execute(f"drop table if exists {UCL_TABLE}")
+
+if __name__ == '__main__':
+    main()
@@ -12,13 +12,28 @@ Each (work × concept) row includes:
   - unit_name_auto         : human label for the unit
   - raw_affiliation        : the author's raw affiliation string on that work (for QA)
   - institution_ror        : best-guess institution ROR on the authorship (if any)
-  - concept_label_openalex : human label for the concept (OpenAlex display_name)
+
+Concept labels (OpenAlex display_name) are a property of the concept, not the
+work, so they are written once per concept to data/concepts.csv.
+
+Progress is checkpointed per batch of authors: if a run is interrupted,
+re-running with the same roster and start date appends only the authors it
+had not finished to data/works.csv.
 
 Environment variables:
   OPENALEX_MAILTO        (recommended) your email for OpenAlex "polite pool"
   OPENALEX_API_KEY       (optional) premium key
-  OPENALEX_RATE_SECONDS  (optional) delay between page fetches (default 0.25s)
+  OPENALEX_RATE_SECONDS  (optional) min. spacing between request starts, across all
+                         concurrent fetches (default 0.25s)
+  OPENALEX_CONCURRENCY   (optional) author batches harvested concurrently (default 16)
+  OPENALEX_BATCH_SIZE    (optional) authors per OR-filtered request (default 50, max 100)
+  OPENALEX_WORKERS       (optional) processes the author batches are sharded
+                         across (default: CPU count, at most one per batch);
+                         rate and concurrency are split between them
   OPENALEX_START_DATE    (optional) ISO date, default "2015-01-01"
+  OPENALEX_CACHE_TTL_SECONDS (optional) reuse cached response pages for this long
+                         (default 259200, i.e. 3 days; 0 disables reads from the
+                         cache); older pages are deleted at startup
 
 Inputs:
   data/roster_with_metrics.csv   (must contain column: OpenAlexID)
@@ -27,19 +42,35 @@ Inputs:
 
 Outputs:
   data/works.csv                 (work×concept; includes unit_id_auto etc.)
+  data/works.parquet             (same rows, zstd Parquet; what dbt reads)
   data/globals_concepts.csv      (global concept counts by year)
+  data/concepts.csv              (concept_id → concept_label_openalex)
+  data/.cache/openalex/          (response pages, reused by re-runs within the TTL;
+                                  checkpoint.json while a run is in progress)
 """
 from __future__ import annotations
 
+import asyncio
+import csv
+import functools
+import glob
+import gzip
+import hashlib
+import json
 import os
+import random
 import re
+import shutil
 import sys
 import time
-from typing import Dict, Iterable, List, Optional, Tuple
+from datetime import date
+from multiprocessing import Pool
+from typing import Callable, Dict, FrozenSet, Iterable, List, Optional, Tuple
 
+import duckdb
+import httpx
+import orjson
 import pandas as pd
-import requests
-from dateutil.parser import isoparse
 
 # ---------------------------------------------------------------------
 # Config / environment
@@ -48,20 +79,68 @@ OPENALEX_BASE = "https://api.openalex.org"
 MAILTO = os.environ.get("OPENALEX_MAILTO", "").strip()
 API_KEY = os.environ.get("OPENALEX_API_KEY", "").strip()
 RATE = float(os.environ.get("OPENALEX_RATE_SECONDS", "0.25"))
+CONCURRENCY = int(os.environ.get("OPENALEX_CONCURRENCY", "16"))
+# OpenAlex accepts at most 100 values per OR filter
+MAX_OR_VALUES = 100
+# Authors per OR-filter request
+BATCH_SIZE = min(int(os.environ.get("OPENALEX_BATCH_SIZE", "50")), MAX_OR_VALUES)
+WORKERS = int(os.environ.get("OPENALEX_WORKERS", "0")) or os.cpu_count() or 1
 START_DATE = os.environ.get("OPENALEX_START_DATE", "2015-01-01")
 
+# Retries: backoff doubles from 1s up to this cap
+MAX_BACKOFF = 30.0
+
+# Paging: basic (page=N) paging only reaches the first 10,000 results
+PER_PAGE = 200
+PAGING_LIMIT = 10_000
+
+# Only the top-level work fields read below (select= cannot pick nested fields)
+WORKS_SELECT = "id,publication_date,publication_year,authorships,is_authors_truncated,concepts"
+# Explicit order, so which works land on which page does not drift between
+# requests (ties are caught by the id check in fetch_all)
+WORKS_SORT = "publication_date:asc"
+
 # Paths
 DATA_DIR = "data"
 ROSTER_CSV = os.path.join(DATA_DIR, "roster_with_metrics.csv")
 WORKS_OUT = os.path.join(DATA_DIR, "works.csv")
+WORKS_PARQUET = os.path.join(DATA_DIR, "works.parquet")
+WORKS_PART = os.path.join(DATA_DIR, "works.part-{}.csv")
 GLOBALS_OUT = os.path.join(DATA_DIR, "globals_concepts.csv")
+CONCEPTS_OUT = os.path.join(DATA_DIR, "concepts.csv")
+
+# On-disk cache of OpenAlex response pages (gzipped JSON, one file per request)
+CACHE_DIR = os.path.join(DATA_DIR, ".cache", "openalex")
+# Resume state of an interrupted run (main process / per shard worker)
+CHECKPOINT = os.path.join(CACHE_DIR, "checkpoint.json")
+CHECKPOINT_PART = os.path.join(CACHE_DIR, "checkpoint.part-{}.json")
+# Longer than the nightly schedule, so one run's pages survive until the next
+CACHE_TTL = float(os.environ.get("OPENALEX_CACHE_TTL_SECONDS", str(3 * 86400)))
+
+# Column order of works.csv; rows are plain tuples in this order
+FIELDS = (
+    "work_id",
+    "published_date",
+    "year",
+    "author_openalex_id",
+    "raw_affiliation",
+    "unit_id_auto",
+    "unit_name_auto",
+    "institution_ror",
+    "concept_id",
+    "concept_level",
+)
 
 ALIASES_CSV = os.path.join("seeds", "unit_aliases.csv")
 OVERRIDES_CSV = os.path.join("seeds", "author_overrides.csv")
 
+# Shared stand-in for missing JSON objects; only ever read, never mutated
+EMPTY: dict = {}
+
 # ---------------------------------------------------------------------
 # Helpers
 # ---------------------------------------------------------------------
+@functools.lru_cache(maxsize=100_000)
 def humanize_concept_id(cid: Optional[str]) -> Optional[str]:
     """Fallback label from an OpenAlex concept URL like https://openalex.org/C123..."""
     if not cid:
@@ -71,32 +150,66 @@ def humanize_concept_id(cid: Optional[str]) -> Optional[str]:
 
 
 def normalize_year(pub_date: Optional[str], fallback_year: Optional[int]) -> Optional[int]:
+    # Only the year is needed: slice it off ISO dates instead of parsing them
     if pub_date:
+        if len(pub_date) >= 4 and pub_date[:4].isdigit():
+            return int(pub_date[:4])
         try:
-            return isoparse(pub_date).year
-        except Exception:
+            return date.fromisoformat(pub_date).year
+        except ValueError:
             pass
     return fallback_year
 
 
-def _session() -> requests.Session:
-    if not MAILTO:
-        sys.stderr.write(
-            "[warn] OPENALEX_MAILTO not set. Add your institutional email to avoid 403s.\n"
-        )
-    s = requests.Session()
-    ua_email = f"(mailto:{MAILTO})" if MAILTO else "(mailto:someone@example.com)"
-    s.headers.update({
-        "User-Agent": f"VeterinaryFOS/1.0 {ua_email}",
-        "Accept": "application/json",
-    })
-    return s
+class RateLimiter:
+    """Global pacing for request starts: at most one every ``interval`` seconds, across all tasks."""
+
+    def __init__(self, interval: float) -> None:
+        self.interval = interval
+        self._next = 0.0
+        self._lock = asyncio.Lock()
+
+    async def wait(self) -> None:
+        if self.interval <= 0:
+            return
+        async with self._lock:
+            now = asyncio.get_running_loop().time()
+            delay = self._next - now
+            self._next = max(now, self._next) + self.interval
+        if delay > 0:
+            await asyncio.sleep(delay)
 
 
-SESSION = _session()
+LIMITER = RateLimiter(RATE)
 
 
-def _get(path: str, params: Dict, max_retries: int = 6) -> requests.Response:
+def _client() -> httpx.AsyncClient:
+    ua_email = f"(mailto:{MAILTO})" if MAILTO else "(mailto:someone@example.com)"
+    return httpx.AsyncClient(
+        http2=True,
+        headers={
+            "User-Agent": f"VeterinaryFOS/1.0 {ua_email}",
+            "Accept": "application/json",
+        },
+        # One pooled client per run: idle connections are kept for a minute so
+        # TLS sessions are reused across authors instead of re-handshaking
+        limits=httpx.Limits(max_connections=100, keepalive_expiry=60),
+        timeout=httpx.Timeout(60),
+    )
+
+
+def _retry_delay(r: Optional[httpx.Response], backoff: float) -> float:
+    """Seconds to wait before retrying ``r`` (None: no response): Retry-After when given, plus jitter."""
+    delay = backoff
+    if r is not None and r.status_code in (429, 503):
+        try:
+            delay = float(r.headers.get("Retry-After", backoff))
+        except ValueError:
+            pass  # HTTP-date form; keep the exponential backoff
+    return min(delay, MAX_BACKOFF) + random.uniform(0, 0.25 * backoff)
+
+
+async def _get(client: httpx.AsyncClient, path: str, params: Dict, max_retries: int = 6) -> httpx.Response:
     """GET with retries and polite query params; raises on non-OK."""
     q = dict(params or {})
     if MAILTO:
@@ -107,16 +220,25 @@ def _get(path: str, params: Dict, max_retries: int = 6) -> requests.Response:
     url = f"{OPENALEX_BASE}/{path.lstrip('/')}"
     backoff = 1.0
     for _attempt in range(max_retries):
-        r = SESSION.get(url, params=q, timeout=60)
+        await LIMITER.wait()
+        try:
+            r = await client.get(url, params=q)
+        except httpx.TransportError:
+            if _attempt == max_retries - 1:
+                raise
+            await asyncio.sleep(_retry_delay(None, backoff))
+            backoff = min(backoff * 2, MAX_BACKOFF)
+            continue
         if r.status_code in (429, 500, 502, 503, 504):
-            time.sleep(backoff)
-            backoff = min(backoff * 2, 30)
+            await asyncio.sleep(_retry_delay(r, backoff))
+            backoff = min(backoff * 2, MAX_BACKOFF)
             continue
         if r.status_code == 403:
             msg = r.text[:500].replace("\n", " ")
-            raise requests.HTTPError(
+            raise httpx.HTTPStatusError(
                 "403 from OpenAlex. Ensure a mailto is provided (header + query) and filter syntax is valid. "
                 f"Response: {msg}",
+                request=r.request,
                 response=r,
             )
         r.raise_for_status()
@@ -124,79 +246,225 @@ def _get(path: str, params: Dict, max_retries: int = 6) -> requests.Response:
     r.raise_for_status()
 
 
-def fetch_all(endpoint: str, filter_str: str) -> List[dict]:
-    """Fetch all pages for an endpoint using cursor-based pagination."""
-    out: List[dict] = []
-    cursor = "*"
-    while True:
-        params = {"per_page": 200, "cursor": cursor, "filter": filter_str}
-        r = _get(endpoint, params)
-        j = r.json()
-        out.extend(j.get("results", []) or [])
-        cursor = (j.get("meta") or {}).get("next_cursor")
-        if not cursor:
-            break
-        time.sleep(RATE)
-    return out
+def _cache_path(path: str, params: Dict, version: Optional[int] = None) -> str:
+    key = json.dumps([path.lstrip("/"), sorted(params.items()), version])
+    return os.path.join(CACHE_DIR, hashlib.sha256(key.encode()).hexdigest() + ".json.gz")
+
+
+async def _get_json(
+    client: httpx.AsyncClient,
+    path: str,
+    params: Dict,
+    fresh: bool = False,
+    version: Optional[int] = None,
+) -> dict:
+    """Decoded JSON for one request via CACHE_DIR; ``fresh`` bypasses the cache both ways."""
+    # Keyed on the caller's params, i.e. without mailto/api_key
+    cache_file = _cache_path(path, params, version)
+    if fresh:
+        # Whatever is cached under this key is no longer trusted
+        try:
+            os.remove(cache_file)
+        except OSError:
+            pass
+        return orjson.loads((await _get(client, path, params)).content)
+
+    try:
+        if time.time() - os.path.getmtime(cache_file) < CACHE_TTL:
+            with gzip.open(cache_file, "rb") as fh:
+                return orjson.loads(fh.read())
+    except (OSError, EOFError, orjson.JSONDecodeError):
+        pass  # missing, unreadable or truncated: refetch
+
+    r = await _get(client, path, params)
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    tmp = f"{cache_file}.{os.getpid()}.tmp"
+    with gzip.open(tmp, "wb") as fh:
+        fh.write(r.content)
+    os.replace(tmp, cache_file)
+    return orjson.loads(r.content)
+
+
+def _results(pages: Iterable[dict]) -> List[dict]:
+    """Results of all ``pages`` in order, each work id kept once."""
+    out: Dict[str, dict] = {}
+    for j in pages:
+        for w in j.get("results", []) or []:
+            out.setdefault(w.get("id"), w)
+    return list(out.values())
+
+
+def prune_cache(ttl: float = CACHE_TTL) -> int:
+    """Delete cached response pages older than ``ttl``; returns files removed."""
+    removed = 0
+    cutoff = time.time() - ttl
+    for path in glob.glob(os.path.join(CACHE_DIR, "*.json.gz")):
+        try:
+            if os.path.getmtime(path) < cutoff:
+                os.remove(path)
+                removed += 1
+        except OSError:
+            pass  # removed concurrently
+    return removed
+
+
+async def fetch_all(
+    client: httpx.AsyncClient,
+    endpoint: str,
+    filter_str: str,
+    select: Optional[str] = None,
+    sort: Optional[str] = None,
+) -> List[dict]:
+    """Fetch all pages for an endpoint: by page number concurrently when it fits, else by cursor."""
+    base = {"per_page": PER_PAGE, "filter": filter_str}
+    if select:
+        base["select"] = select
+    if sort:
+        base["sort"] = sort
+    first = await _get_json(client, endpoint, {**base, "page": 1}, fresh=True)
+    count = (first.get("meta") or {}).get("count") or 0
+
+    async def by_page(fresh: bool) -> List[dict]:
+        n_pages = -(-count // PER_PAGE)
+        rest = await asyncio.gather(*(
+            _get_json(client, endpoint, {**base, "page": page}, fresh=fresh, version=count)
+            for page in range(2, n_pages + 1)
+        ))
+        return [first, *rest]
+
+    async def by_cursor(fresh: bool) -> List[dict]:
+        out = []
+        cursor = "*"
+        while cursor:
+            j = await _get_json(client, endpoint, {**base, "cursor": cursor}, fresh=fresh, version=count)
+            out.append(j)
+            cursor = (j.get("meta") or {}).get("next_cursor")
+        return out
+
+    # Page-number requests are independent, so ties in the sort can shuffle
+    # works across pages; a cursor walk cannot skip or repeat any
+    if count <= PAGING_LIMIT:
+        results = _results(await by_page(fresh=False))
+        if len(results) != count:
+            results = _results(await by_page(fresh=True))
+        if len(results) != count:
+            sys.stderr.write(
+                f"[warn] {filter_str}: pages gave {len(results)} unique works of {count}; walking the cursor\n"
+            )
+            results = _results(await by_cursor(fresh=True))
+    else:
+        results = _results(await by_cursor(fresh=False))
+        if len(results) != count:
+            results = _results(await by_cursor(fresh=True))
+    if len(results) != count:
+        sys.stderr.write(f"[warn] {filter_str}: got {len(results)} unique works, OpenAlex counts {count}\n")
+    return results
 
 # ---------------------------------------------------------------------
 # Seeds: aliases & overrides (optional)
 # ---------------------------------------------------------------------
+def _read_seed(path: str) -> pd.DataFrame:
+    """Read a seed CSV as strings with lower-cased column names ('' for blanks)."""
+    df = pd.read_csv(path, dtype=str, keep_default_na=False)
+    df.columns = df.columns.str.lower()
+    return df
+
+
+def _compile(pattern: str) -> Optional[re.Pattern]:
+    try:
+        return re.compile(pattern) if pattern else None
+    except re.error:
+        return None
+
+
 def load_alias_rules(path: str) -> List[dict]:
     if not os.path.exists(path):
         return []
-    df = pd.read_csv(path)
-    # Normalize columns and order by priority desc
-    cols = {c.lower(): c for c in df.columns}
-    def get(row, key):
-        return row[cols[key]] if key in cols else None
-    rules: List[dict] = []
-    for _, row in df.iterrows():
-        rules.append({
-            "pattern": str(get(row, "pattern") or "").strip(),
-            "unit_id": str(get(row, "unit_id") or "").strip(),
-            "unit_name": str(get(row, "unit_name") or "").strip(),
-            "priority": int(get(row, "priority") or 0),
-        })
-    rules.sort(key=lambda r: r.get("priority", 0), reverse=True)
-    # Pre-compile regex where possible
-    compiled: List[dict] = []
-    for r in rules:
-        pat = r.get("pattern") or ""
-        try:
-            r["_re"] = re.compile(pat) if pat else None
-        except re.error:
-            r["_re"] = None
-        compiled.append(r)
-    return compiled
+    df = _read_seed(path)
+    rules: List[dict] = [
+        {
+            "pattern": str(rec.get("pattern") or "").strip(),
+            "unit_id": str(rec.get("unit_id") or "").strip(),
+            "unit_name": str(rec.get("unit_name") or "").strip(),
+            "priority": int(rec.get("priority") or 0),
+        }
+        for rec in df.to_dict(orient="records")
+    ]
+    # Order by priority desc, then pre-compile regex where possible
+    rules.sort(key=lambda r: r["priority"], reverse=True)
+    for r, rx in zip(rules, map(_compile, (r["pattern"] for r in rules))):
+        r["_re"] = rx
+    return rules
 
 
 def load_author_overrides(path: str) -> Dict[str, Dict[str, str]]:
     if not os.path.exists(path):
         return {}
-    df = pd.read_csv(path)
+    df = _read_seed(path)
     out: Dict[str, Dict[str, str]] = {}
-    # Normalize column access
-    cols = {c.lower(): c for c in df.columns}
-    for _, row in df.iterrows():
-        key_author = cols.get("author_openalex_id", "author_openalex_id")
-        key_unit = cols.get("unit_id", "unit_id")
-        key_name = cols.get("unit_name", "unit_name")
-        aid = str(row[key_author]).strip()
+    for rec in df.to_dict(orient="records"):
+        aid = str(rec.get("author_openalex_id") or "").strip()
         if not aid:
             continue
         out[aid] = {
-            "unit_id": str(row[key_unit]).strip(),
-            "unit_name": str(row[key_name]).strip(),
+            "unit_id": str(rec.get("unit_id") or "").strip(),
+            "unit_name": str(rec.get("unit_name") or "").strip(),
         }
     return out
 
 
+_GLOBAL_FLAGS = re.compile(r"^\(\?([aiLmsux]+)\)")
+# Numbered group references (\1..\9, conditionals like (?(1)b|c)) count groups
+# from the start of the whole expression, so once folded they would point into
+# another rule's wrapper group
+_NUMBERED_GROUP_REF = re.compile(r"\\[1-9]|\(\?\(\d")
+
+
+def compile_alias_matcher(rules: List[dict]) -> Tuple[Optional[re.Pattern], Dict[str, dict]]:
+    """Fold the alias rules into one regex, tried in priority order; returns (regex, rule by group name).
+
+    Returns (None, {}) when the rules cannot be folded; callers then use the per-rule loop.
+    """
+    if any(r.get("_re") is not None and _NUMBERED_GROUP_REF.search(r["pattern"]) for r in rules):
+        return None, {}
+    parts: List[str] = []
+    by_group: Dict[str, dict] = {}
+    for i, r in enumerate(rules):
+        if r.get("_re") is None:
+            continue
+        m = _GLOBAL_FLAGS.match(r["pattern"])
+        pat = f"(?{m.group(1)}:{r['pattern'][m.end():]})" if m else r["pattern"]
+        name = f"r{i}"
+        parts.append(f"^(?=(?s:.*?)(?P<{name}>{pat}))")
+        by_group[name] = r
+    if not parts:
+        return None, {}
+    try:
+        return re.compile("|".join(parts)), by_group
+    except re.error:
+        return None, {}
+
+
 # Load optional seeds once
 ALIAS_RULES = load_alias_rules(ALIASES_CSV)
+ALIAS_RE, ALIAS_RULES_BY_GROUP = compile_alias_matcher(ALIAS_RULES)
+HAS_ALIASES = any(r.get("_re") is not None for r in ALIAS_RULES)
 AUTHOR_OVERRIDES = load_author_overrides(OVERRIDES_CSV)
 
 
+def match_alias_rule(hay: str) -> Optional[dict]:
+    """Highest-priority alias rule whose pattern occurs in ``hay``, if any."""
+    if ALIAS_RE is not None:
+        m = ALIAS_RE.match(hay)
+        # The wrapper group closes last, so lastgroup names the rule
+        return ALIAS_RULES_BY_GROUP[m.lastgroup] if m else None
+    for rule in ALIAS_RULES:
+        rx = rule.get("_re")
+        if rx and rx.search(hay):
+            return rule
+    return None
+
+
 def choose_unit_for_authorship(aid: str, authorship: dict) -> Tuple[str, str, Optional[str], Optional[str]]:
     """Return (unit_id_auto, unit_name_auto, raw_affiliation, institution_ror_candidate)."""
     raw_aff = authorship.get("raw_affiliation_string") if authorship else None
@@ -212,32 +480,27 @@ def choose_unit_for_authorship(aid: str, authorship: dict) -> Tuple[str, str, Op
         )
 
     # 1) try the deepest institution on this authorship
-    insts = (authorship or {}).get("institutions") or []
-    best = None  # (score, inst)
-    for inst in insts:
-        disp = inst.get("display_name") or ""
-        score = len(disp)
-        if best is None or score > best[0]:
-            best = (score, inst)
+    insts = (authorship or EMPTY).get("institutions") or ()
+    # Longest display name wins (first one on ties)
+    inst = max(insts, key=lambda i: len(i.get("display_name") or ""), default=None)
     cand_ror: Optional[str] = None
     cand_name: Optional[str] = None
-    if best is not None:
-        inst = best[1]
+    if inst is not None:
         cand_ror = inst.get("ror") or inst.get("id")
         cand_name = inst.get("display_name") or cand_ror
 
     # 2) regex aliases on raw affiliation + institution name
-    hay = " ".join([raw_aff or "", cand_name or ""]).strip()
-    if hay:
-        for rule in ALIAS_RULES:
-            rx = rule.get("_re")
-            if rx and rx.search(hay):
-                return (
-                    rule.get("unit_id") or (cand_ror or f"author:{aid}"),
-                    rule.get("unit_name") or (cand_name or f"Author {aid}"),
-                    raw_aff,
-                    cand_ror,
-                )
+    #    (skipped outright when no alias seed is loaded)
+    if HAS_ALIASES:
+        hay = " ".join([raw_aff or "", cand_name or ""]).strip()
+        rule = match_alias_rule(hay) if hay else None
+        if rule is not None:
+            return (
+                rule.get("unit_id") or (cand_ror or f"author:{aid}"),
+                rule.get("unit_name") or (cand_name or f"Author {aid}"),
+                raw_aff,
+                cand_ror,
+            )
 
     # 3) fallback to candidate institution (likely the university ROR)
     if cand_ror:
@@ -250,94 +513,380 @@ def choose_unit_for_authorship(aid: str, authorship: dict) -> Tuple[str, str, Op
 # ETL core
 # ---------------------------------------------------------------------
 def read_roster_ids(path: str) -> List[str]:
-    df = pd.read_csv(path)
-    if "OpenAlexID" not in df.columns:
-        raise SystemExit(f"Missing 'OpenAlexID' column in {path}")
-    ids = [str(x).strip() for x in df["OpenAlexID"].dropna().tolist()]
+    with open(path, newline="", encoding="utf-8") as fh:
+        reader = csv.DictReader(fh)
+        if "OpenAlexID" not in (reader.fieldnames or ()):
+            raise SystemExit(f"Missing 'OpenAlexID' column in {path}")
+        ids = [(row["OpenAlexID"] or "").strip() for row in reader]
     ids = [i for i in ids if i and i != "nan"]
     if not ids:
         raise SystemExit("No OpenAlex IDs found in roster.")
     return ids
 
 
-def harvest_for_author(aid: str) -> Iterable[dict]:
-    """Yield work×concept rows for one author since START_DATE, with unit mapping."""
-    # IMPORTANT: from_publication_date must live inside the filter param.
-    filter_str = f"authorships.author.id:{aid},from_publication_date:{START_DATE}"
-    works = fetch_all("works", filter_str)
+def _batch_authors(aids: FrozenSet[str], w: dict) -> bool:
+    return any((au.get("author") or EMPTY).get("id") in aids for au in (w.get("authorships") or ()))
+
+
+async def complete_authorships(client: httpx.AsyncClient, aids: FrozenSet[str], works: List[dict]) -> List[dict]:
+    """Replace truncated works, and works showing no batch author, with their full single-work record."""
+    idx = [i for i, w in enumerate(works) if w.get("is_authors_truncated") or not _batch_authors(aids, w)]
+    full = await asyncio.gather(*(
+        _get_json(client, f"works/{works[i]['id'].rsplit('/', 1)[-1]}", {"select": WORKS_SELECT})
+        for i in idx
+    ))
+    works = list(works)
+    for i, w in zip(idx, full):
+        works[i] = w
+    return works
+
+
+async def attribute_orphans(
+    client: httpx.AsyncClient, aids: List[str], works: List[dict], orphans: List[dict]
+) -> Dict[str, List[str]]:
+    """Map each orphan work id (matched by the filter, no batch author listed) to its batch authors."""
+    # An id that shows up on any work is live; only ids never seen (merged
+    # authors) can have produced the orphans
+    seen = {(au.get("author") or EMPTY).get("id") for w in works for au in (w.get("authorships") or ())}
+    candidates = [aid for aid in aids if aid not in seen]
+    wids = [w["id"] for w in orphans]
+    if len(candidates) == 1:
+        return {wid: candidates for wid in wids}
+
+    chunks = [wids[i:i + MAX_OR_VALUES] for i in range(0, len(wids), MAX_OR_VALUES)]
+    jobs = [(aid, chunk) for aid in candidates for chunk in chunks]
+    found = await asyncio.gather(*(
+        _get_json(client, "works", {
+            "filter": f"authorships.author.id:{aid},openalex:{'|'.join(chunk)}",
+            "select": "id",
+            "per_page": PER_PAGE,
+        })
+        for aid, chunk in jobs
+    ))
+    out: Dict[str, List[str]] = {}
+    for (aid, _), j in zip(jobs, found):
+        for w in j.get("results", []) or []:
+            out.setdefault(w["id"], []).append(aid)
+    return out
 
+
+async def harvest_for_authors(client: httpx.AsyncClient, aids: List[str], labels: Dict[str, str]) -> List[tuple]:
+    """Return work×concept rows for a batch of authors since START_DATE, fetched with one OR filter."""
+    # IMPORTANT: from_publication_date must live inside the filter param.
+    filter_str = f"authorships.author.id:{'|'.join(aids)},from_publication_date:{START_DATE}"
+    works = await fetch_all(client, "works", filter_str, select=WORKS_SELECT, sort=WORKS_SORT)
+    aid_set = frozenset(aids)
+    works = await complete_authorships(client, aid_set, works)
+    orphans = [w for w in works if not _batch_authors(aid_set, w)]
+    fallback = await attribute_orphans(client, aids, works, orphans) if orphans else {}
+    for w in orphans:
+        if w["id"] not in fallback:
+            sys.stderr.write(f"[warn] {w['id']} matched the filter but no author in the batch\n")
+    return list(work_rows(aid_set, works, labels, fallback))
+
+
+def work_rows(
+    aids: FrozenSet[str],
+    works: Iterable[dict],
+    labels: Dict[str, str],
+    fallback: Optional[Dict[str, List[str]]] = None,
+) -> Iterable[tuple]:
+    """Yield work×concept rows (tuples in FIELDS order) for the given authors' works.
+
+    ``fallback`` maps a work id to authors on it without an authorship; labels go to ``labels``.
+    """
     for w in works:
         wid = w.get("id")
-        pub_date = (
-            w.get("publication_date")
-            or w.get("from_publication_date")
-            or (w.get("host_venue") or {}).get("published_date")
-        )
-        year = normalize_year(pub_date, w.get("publication_year"))
+        pub_date = w.get("publication_date")
+        # OpenAlex already provides the year; the date is only a fallback
+        year = w.get("publication_year") or normalize_year(pub_date, None)
+
+        # OpenAlex can list a concept more than once on a work; keep the first
+        concepts: List[Tuple[str, int]] = []
+        seen = set()
+        for c in (w.get("concepts") or ()):
+            cid = c.get("id")
+            clevel = c.get("level")
+            if cid and clevel is not None and cid not in seen:
+                seen.add(cid)
+                concepts.append((cid, clevel))
+                if cid not in labels:
+                    labels[cid] = c.get("display_name") or humanize_concept_id(cid)
+
+        # One expansion per batch author on this work (first authorship block wins)
+        done = set()
+        matches = [((au.get("author") or EMPTY).get("id"), au) for au in (w.get("authorships") or ())]
+        matches += [(aid, EMPTY) for aid in (fallback or EMPTY).get(wid, ())]
+        for aid, au in matches:
+            if aid not in aids or aid in done:
+                continue
+            done.add(aid)
+
+            unit_id, unit_name, raw_aff, inst_ror = choose_unit_for_authorship(aid, au)
+            for cid, clevel in concepts:
+                yield (
+                    wid,
+                    pub_date,
+                    year,
+                    aid,
+                    raw_aff,
+                    unit_id,
+                    unit_name,
+                    inst_ror,
+                    cid,
+                    clevel,
+                )
 
-        # Find this author's authorship block
-        au_self = None
-        for au in (w.get("authorships") or []):
-            if (au.get("author") or {}).get("id") == aid:
-                au_self = au
-                break
 
-        unit_id, unit_name, raw_aff, inst_ror = choose_unit_for_authorship(aid, au_self or {})
+def make_batches(author_ids: List[str], size: int = BATCH_SIZE) -> List[List[str]]:
+    """Split the de-duplicated ``author_ids`` (roster order kept) into OR-filter batches."""
+    unique_ids = list(dict.fromkeys(author_ids))
+    return [unique_ids[i:i + size] for i in range(0, len(unique_ids), size)]
+
+
+async def harvest_all(
+    batches: List[List[str]],
+    on_batch: Callable[[List[str], List[tuple]], None],
+    labels: Dict[str, str],
+    concurrency: int = CONCURRENCY,
+) -> None:
+    """Harvest the author batches, at most ``concurrency`` at a time; rows go to ``on_batch(aids, rows)``."""
+    sem = asyncio.Semaphore(concurrency)
+
+    async with _client() as client:
+        async def one(idx: int, aids: List[str]) -> None:
+            async with sem:
+                print(f"[{idx}/{len(batches)}] Fetching works for {len(aids)} authors since {START_DATE}…", flush=True)
+                try:
+                    rows = await harvest_for_authors(client, aids, labels)
+                except httpx.HTTPError as e:
+                    if len(aids) == 1:
+                        sys.stderr.write(f"ERROR for {aids[0]}: {e}\n")
+                        await asyncio.sleep(1.5)
+                        return
+                    # Retry the batch author by author so one failure costs one author
+                    sys.stderr.write(f"ERROR for batch {idx}, retrying its {len(aids)} authors one by one: {e}\n")
+                    results = await asyncio.gather(
+                        *(harvest_for_authors(client, [aid], labels) for aid in aids), return_exceptions=True
+                    )
+                    ok, rows = [], []
+                    for aid, res in zip(aids, results):
+                        if isinstance(res, httpx.HTTPError):
+                            sys.stderr.write(f"ERROR for {aid}: {res}\n")
+                        elif isinstance(res, BaseException):
+                            raise res
+                        else:
+                            ok.append(aid)
+                            rows.extend(res)
+                    aids = ok
+            on_batch(aids, rows)
+
+        await asyncio.gather(*(one(idx, aids) for idx, aids in enumerate(batches, 1)))
 
-        concepts = w.get("concepts") or []
-        for c in concepts:
-            cid = c.get("id")
-            clevel = c.get("level")
-            cname = c.get("display_name") or humanize_concept_id(cid)
-            if cid and clevel is not None:
-                yield {
-                    "work_id": wid,
-                    "published_date": pub_date,
-                    "year": year,
-                    "author_openalex_id": aid,
-                    "raw_affiliation": raw_aff,
-                    "unit_id_auto": unit_id,
-                    "unit_name_auto": unit_name,
-                    "institution_ror": inst_ror,
-                    "concept_id": cid,
-                    "concept_level": clevel,
-                    "concept_label_openalex": cname,
-                }
+
+# ---------------------------------------------------------------------
+# Checkpoint: lets an interrupted run resume instead of starting over
+# ---------------------------------------------------------------------
+def run_key(author_ids: List[str]) -> str:
+    """Identify a harvest by START_DATE and roster, so a checkpoint only resumes the same run."""
+    key = json.dumps([START_DATE, sorted(set(author_ids))])
+    return hashlib.sha256(key.encode()).hexdigest()
+
+
+def load_checkpoint(path: str, run: str) -> Tuple[set, Dict[str, str]]:
+    """Return (authors already written, concept labels seen so far) from ``path``, if it is for ``run``."""
+    try:
+        with open(path, "rb") as fh:
+            ck = orjson.loads(fh.read())
+    except (OSError, orjson.JSONDecodeError):
+        return set(), {}
+    if ck.get("run") != run:
+        return set(), {}
+    done = {aid for aid, st in (ck.get("authors") or {}).items() if st.get("done")}
+    return done, dict(ck.get("labels") or {})
+
+
+def save_checkpoint(path: str, run: str, done: set, labels: Dict[str, str]) -> None:
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.tmp"
+    with open(tmp, "wb") as fh:
+        fh.write(orjson.dumps({
+            "run": run,
+            "authors": {aid: {"done": True} for aid in sorted(done)},
+            "labels": labels,
+        }))
+    os.replace(tmp, path)
+
+
+def _trim_partial_line(path: str, block: int = 1 << 16) -> None:
+    """Drop a trailing row that a crash left half-written, reading only the tail of the file."""
+    with open(path, "rb+") as fh:
+        end = fh.seek(0, os.SEEK_END)
+        while end > 0:
+            start = max(0, end - block)
+            fh.seek(start)
+            nl = fh.read(end - start).rfind(b"\n")
+            if nl >= 0:
+                fh.truncate(start + nl + 1)
+                return
+            end = start
+        fh.truncate(0)
+
+
+def recover_checkpoint(run: str) -> Tuple[set, Dict[str, str]]:
+    """Fold an interrupted ``run``'s leftovers into WORKS_OUT; returns (done authors, labels)."""
+    parts = sorted(glob.glob(WORKS_PART.format("*")))
+    checkpoints = [CHECKPOINT] + sorted(glob.glob(CHECKPOINT_PART.format("*")))
+    done: set = set()
+    labels: Dict[str, str] = {}
+    if os.path.exists(WORKS_OUT):
+        for path in checkpoints:
+            d, lab = load_checkpoint(path, run)
+            done |= d
+            labels.update(lab)
+    if done:
+        _trim_partial_line(WORKS_OUT)
+        with open(WORKS_OUT, "ab") as out:
+            for part in parts:
+                _trim_partial_line(part)
+                with open(part, "rb") as fh:
+                    shutil.copyfileobj(fh, out)
+        save_checkpoint(CHECKPOINT, run, done, labels)
+    for path in parts + checkpoints[1:] + ([] if done else [CHECKPOINT]):
+        if os.path.exists(path):
+            os.remove(path)
+    return done, labels
+
+
+def harvest_to_csv(
+    batches: List[List[str]],
+    path: str,
+    checkpoint: str,
+    run: str,
+    n_shards: int = 1,
+    done: Optional[set] = None,
+    labels: Optional[Dict[str, str]] = None,
+) -> Tuple[int, Dict[str, str]]:
+    """Append a harvest of ``batches`` to ``path`` (no header), checkpointing each batch; returns (rows, labels)."""
+    LIMITER.interval = RATE * n_shards
+    done = set(done or ())
+    labels = dict(labels or {})
+    n_rows = 0
+    with open(path, "a", newline="", encoding="utf-8") as fh:
+        writer = csv.writer(fh, lineterminator="\n")
+
+        def on_batch(aids: List[str], rows: List[tuple]) -> None:
+            nonlocal n_rows
+            writer.writerows(rows)
+            fh.flush()
+            n_rows += len(rows)
+            done.update(aids)
+            save_checkpoint(checkpoint, run, done, labels)
+
+        asyncio.run(harvest_all(batches, on_batch, labels, max(1, CONCURRENCY // n_shards)))
+    return n_rows, labels
+
+
+def harvest_sharded(batches: List[List[str]], run: str, n_shards: int) -> Tuple[int, Dict[str, str]]:
+    """Harvest ``batches`` across ``n_shards`` processes, appending to WORKS_OUT; returns (rows, labels)."""
+    shards = [batches[k::n_shards] for k in range(n_shards)]
+    jobs = [
+        (shard, WORKS_PART.format(k), CHECKPOINT_PART.format(k), run, n_shards)
+        for k, shard in enumerate(shards)
+    ]
+    with Pool(n_shards) as pool:
+        results = pool.starmap(harvest_to_csv, jobs)
+    with open(WORKS_OUT, "ab") as out:
+        for _, part, _, _, _ in jobs:
+            with open(part, "rb") as fh:
+                shutil.copyfileobj(fh, out)
+            os.remove(part)
+    labels: Dict[str, str] = {}
+    for _, shard_labels in results:
+        labels.update(shard_labels)
+    return sum(n for n, _ in results), labels
+
+
+def write_parquet(works_csv: str, out_parquet: str) -> int:
+    """Convert works.csv to zstd Parquet; returns rows written."""
+    (n,) = duckdb.execute(f"""
+        copy (
+          select * from read_csv_auto('{works_csv}', header=true)
+        ) to '{out_parquet}' (format parquet, compression zstd)
+    """).fetchone()
+    return n
+
+
+def write_globals(works_parquet: str, out_csv: str) -> int:
+    """Count distinct works per (concept_id, year) from works.parquet in DuckDB; returns rows written."""
+    (n,) = duckdb.execute(f"""
+        copy (
+          select concept_id, year as period, count(distinct work_id) as global_works
+          from read_parquet('{works_parquet}')
+          group by 1, 2
+        ) to '{out_csv}' (header, format csv)
+    """).fetchone()
+    return n
+
+
+def write_concepts(labels: Dict[str, str], out_csv: str) -> int:
+    """Write one (concept_id, concept_label_openalex) row per concept; returns rows written."""
+    with open(out_csv, "w", newline="", encoding="utf-8") as fh:
+        writer = csv.writer(fh, lineterminator="\n")
+        writer.writerow(("concept_id", "concept_label_openalex"))
+        writer.writerows(sorted(labels.items()))
+    return len(labels)
 
 
 def main() -> None:
     os.makedirs(DATA_DIR, exist_ok=True)
+    n_pruned = prune_cache()
+    if n_pruned:
+        print(f"Pruned {n_pruned} expired pages from {CACHE_DIR}")
 
     author_ids = read_roster_ids(ROSTER_CSV)
+    if not MAILTO:
+        sys.stderr.write(
+            "[warn] OPENALEX_MAILTO not set. Add your institutional email to avoid 403s.\n"
+        )
 
-    rows: List[dict] = []
-    for idx, aid in enumerate(author_ids, 1):
-        print(f"[{idx}/{len(author_ids)}] Fetching works for {aid} since {START_DATE}…", flush=True)
-        try:
-            rows.extend(list(harvest_for_author(aid)))
-        except requests.HTTPError as e:
-            sys.stderr.write(f"ERROR for {aid}: {e}\n")
-            time.sleep(1.5)
-            continue
+    # Resume an interrupted run if it left a checkpoint; otherwise start over
+    run = run_key(author_ids)
+    done, labels = recover_checkpoint(run)
+    pending = [aid for aid in author_ids if aid not in done]
+    if done:
+        print(f"Resuming: {len(done)} authors already in {WORKS_OUT}, {len(pending)} to go")
+    else:
+        with open(WORKS_OUT, "w", newline="", encoding="utf-8") as fh:
+            csv.writer(fh, lineterminator="\n").writerow(FIELDS)
+
+    # Append to works.csv, streaming rows per batch of authors
+    batches = make_batches(pending)
+    n_shards = min(WORKERS, len(batches))
+    if n_shards > 1:
+        n_rows, new_labels = harvest_sharded(batches, run, n_shards)
+    else:
+        n_rows, new_labels = harvest_to_csv(batches, WORKS_OUT, CHECKPOINT, run, done=done, labels=labels)
+    labels.update(new_labels)
+    if done:
+        print(f"Appended {n_rows} rows to {WORKS_OUT}")
+    else:
+        print(f"Wrote {WORKS_OUT} ({n_rows} rows)")
+
+    n_rows = write_parquet(WORKS_OUT, WORKS_PARQUET)
+    print(f"Wrote {WORKS_PARQUET} ({n_rows} rows)")
 
-    # Write works.csv
-    df = pd.DataFrame(rows)
-    df.to_csv(WORKS_OUT, index=False)
-    print(f"Wrote {WORKS_OUT} ({len(df)} rows)")
+    n_concepts = write_concepts(labels, CONCEPTS_OUT)
+    print(f"Wrote {CONCEPTS_OUT} ({n_concepts} rows)")
 
     # Write globals_concepts.csv (global denominators by concept×year)
-    if not df.empty:
-        g = (
-            df.groupby(["concept_id", "year"], dropna=False)
-              .agg(global_works=("work_id", "nunique"))
-              .reset_index()
-              .rename(columns={"year": "period"})
-        )
-    else:
-        g = pd.DataFrame(columns=["concept_id", "period", "global_works"])
+    n_globals = write_globals(WORKS_PARQUET, GLOBALS_OUT)
+    print(f"Wrote {GLOBALS_OUT} ({n_globals} rows)")
 
-    g.to_csv(GLOBALS_OUT, index=False)
-    print(f"Wrote {GLOBALS_OUT} ({len(g)} rows)")
+    # Complete: the next run starts from scratch
+    for path in [CHECKPOINT] + glob.glob(CHECKPOINT_PART.format("*")):
+        if os.path.exists(path):
+            os.remove(path)
 
 
 if __name__ == "__main__":
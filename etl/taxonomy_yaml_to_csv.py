@@ -1,9 +1,15 @@
-import yaml, pandas as pd
+import csv
+import yaml
 from pathlib import Path
 
+# libyaml's C loader when available; same safe semantics as yaml.safe_load
+Loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+FIELDS = ["id", "label", "level", "parents", "synonyms", "include_keywords", "exclude_keywords"]
+
 src = Path("data/vet_taxonomy.yaml")
 dst = Path("seeds/concept_taxonomy.csv")
-obj = yaml.safe_load(src.read_text())
+obj = yaml.load(src.read_text(), Loader=Loader)
 rows = []
 for t in obj:
     rows.append({
@@ -16,5 +22,8 @@ for t in obj:
         "exclude_keywords": "|".join(t.get("exclude_keywords") or []),
     })
 
-pd.DataFrame(rows).to_csv(dst, index=False)
+with dst.open("w", newline="", encoding="utf-8") as f:
+    w = csv.DictWriter(f, fieldnames=FIELDS, lineterminator="\n")
+    w.writeheader()
+    w.writerows(rows)
 print(f"Wrote {dst}")
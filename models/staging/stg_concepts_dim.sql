@@ -1,6 +1,7 @@
 {{ config(materialized='view') }}
+-- ETL writes data/concepts.csv with one OpenAlex label per concept:
+-- concept_id, concept_label_openalex
 select
   concept_id,
-  max(concept_label_openalex) as concept_label_openalex
-from {{ ref('stg_works') }}
-group by concept_id
+  concept_label_openalex
+from read_csv_auto('data/concepts.csv')